@@ -340,11 +340,274 @@ def mean_average_precision(ground_truth_boxes, predicted_boxes):
     print("Mean average precision: {:.4f}".format(mean_average_precision))
 
 
+def calculate_iou_matrix(prediction_boxes, gt_boxes):
+    """Calculate intersection over union between every predicted and ground truth box.
+
+    Args:
+        prediction_boxes (np.array of floats): shape [number of predicted boxes, 4].
+            Each row includes [xmin, ymin, xmax, ymax]
+        gt_boxes (np.array of floats): shape [number of ground truth boxes, 4].
+            Each row includes [xmin, ymin, xmax, ymax]
+    Returns:
+        np.array of floats: shape [number of predicted boxes, number of ground truth boxes].
+            Element [i, j] is calculate_iou(prediction_boxes[i], gt_boxes[j])
+    """
+    prediction_boxes = np.asarray(prediction_boxes, dtype=float).reshape(-1, 4)
+    gt_boxes = np.asarray(gt_boxes, dtype=float).reshape(-1, 4)
+    p = prediction_boxes[:, None, :]
+    g = gt_boxes[None, :, :]
+
+    x1 = np.maximum(p[..., 0], g[..., 0])
+    y1 = np.maximum(p[..., 1], g[..., 1])
+    x2 = np.minimum(p[..., 2], g[..., 2])
+    y2 = np.minimum(p[..., 3], g[..., 3])
+    # Same as calculate_iou: no overlap gives an IoU of 0
+    overlap = np.where((x2 < x1) | (y2 < y1), 0, (x2 - x1)*(y2 - y1))
+
+    area_1 = (p[..., 2] - p[..., 0])*(p[..., 3] - p[..., 1])
+    area_2 = (g[..., 2] - g[..., 0])*(g[..., 3] - g[..., 1])
+    union = area_1 + area_2 - overlap
+    with np.errstate(divide="ignore", invalid="ignore"):
+        iou = np.where(overlap > 0, overlap / union, 0.0)
+    return iou
+
+
+def count_box_matches(ious, iou_threshold):
+    """Counts the matches made by get_all_box_matches, given a precomputed IoU matrix.
+
+    Args:
+        ious: (np.array of floats): shape [number of predicted boxes, number of
+            ground truth boxes], as returned by calculate_iou_matrix
+        iou_threshold (float): minimum IoU for a match
+    Returns:
+        int: number of matched boxes
+    """
+    pred_index, gt_index = np.nonzero(ious >= iou_threshold)
+    order = ious[pred_index, gt_index].argsort()[::-1]
+
+    used_pred = set()
+    used_gt = set()
+    for i, x in zip(pred_index[order], gt_index[order]):
+        if i not in used_pred and x not in used_gt:
+            used_pred.add(i)
+            used_gt.add(x)
+    return len(used_pred)
+
+
+def get_image_statistics(all_prediction_boxes, all_gt_boxes,
+                         confidence_scores, iou_threshold):
+    """Calculates true and false positives for every image at every confidence
+       threshold used by get_precision_recall_curve.
+
+       Summing the statistics over images gives the counts behind
+       get_precision_recall_curve, so they only have to be computed once
+       no matter how the images are resampled afterwards.
+
+    Args:
+        all_prediction_boxes: (list of np.array of floats): each element in the list
+            is a np.array containing all predicted bounding boxes for the given image
+            with shape: [number of predicted boxes, 4].
+        all_gt_boxes: (list of np.array of floats): each element in the list
+            is a np.array containing all ground truth bounding boxes for the given image
+            with shape: [number of ground truth boxes, 4].
+        confidence_scores: (list of np.array of floats): each element in the list
+            is a np.array containting the confidence score for each of the
+            predicted bounding box. Shape: [number of predicted boxes]
+        iou_threshold (float): minimum IoU for a match
+    Returns:
+        tuple: (true_pos, false_pos, num_gt).
+            true_pos and false_pos are np.array of floats with shape
+            [number of images, number of confidence thresholds].
+            num_gt is a np.array of floats with shape [number of images].
+    """
+    # Must match the thresholds in get_precision_recall_curve
+    confidence_thresholds = np.linspace(0, 1, 500)
+    num_images = len(all_gt_boxes)
+
+    true_pos = np.zeros((num_images, len(confidence_thresholds)))
+    false_pos = np.zeros((num_images, len(confidence_thresholds)))
+    num_gt = np.zeros(num_images)
+
+    for img_num in range(num_images):
+        ious = calculate_iou_matrix(all_prediction_boxes[img_num], all_gt_boxes[img_num])
+        scores = np.asarray(confidence_scores[img_num], dtype=float).reshape(-1)
+        num_gt[img_num] = ious.shape[1]
+
+        # The kept boxes only change at the distinct scores of this image, so the
+        # matching is done once per distinct score instead of once per threshold.
+        # The last entry corresponds to no boxes being kept.
+        distinct_scores = np.unique(scores)
+        tp_per_score = np.zeros(len(distinct_scores) + 1)
+        kept_per_score = np.zeros(len(distinct_scores) + 1)
+        for k, s in enumerate(distinct_scores):
+            keep = scores >= s
+            tp_per_score[k] = count_box_matches(ious[keep], iou_threshold)
+            kept_per_score[k] = keep.sum()
+
+        positions = np.searchsorted(distinct_scores, confidence_thresholds, side="left")
+        true_pos[img_num] = tp_per_score[positions]
+        false_pos[img_num] = kept_per_score[positions] - tp_per_score[positions]
+
+    return true_pos, false_pos, num_gt
+
+
+def get_bootstrap_weights(num_images, num_samples, seed=None):
+    """Draws image-level bootstrap resamples.
+
+    Args:
+        num_images (int): number of images in the dataset
+        num_samples (int): number of bootstrap resamples
+        seed (int): seed for the random number generator
+    Returns:
+        np.array of floats: shape [num_samples, num_images].
+            Element [b, i] is how many times image i is drawn in resample b.
+    """
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, num_images, size=(num_samples, num_images))
+    weights = np.zeros((num_samples, num_images))
+    np.add.at(weights, (np.arange(num_samples)[:, None], indices), 1)
+    return weights
+
+
+def calculate_bootstrap_mean_average_precisions(true_pos, false_pos, num_gt, weights):
+    """Calculates the mean average precision for every bootstrap resample at once.
+
+    Args:
+        true_pos: (np.array of floats) shape [number of images, number of thresholds]
+        false_pos: (np.array of floats) shape [number of images, number of thresholds]
+        num_gt: (np.array of floats) shape [number of images]
+        weights: (np.array of floats) shape [number of resamples, number of images]
+    Returns:
+        np.array of floats: mean average precision of each resample.
+            Shape [number of resamples]
+    """
+    tp = weights @ true_pos
+    fp = weights @ false_pos
+    fn = (weights @ num_gt)[:, None] - tp
+
+    # Same conventions as calculate_precision and calculate_recall
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precisions = np.where(tp + fp == 0, 1.0, tp / (tp + fp))
+        recalls = np.where(tp + fn == 0, 0.0, tp / (tp + fn))
+
+    # Must match the recall levels in calculate_mean_average_precision
+    recall_levels = np.linspace(0, 1.0, 11)
+    reached = recalls[:, None, :] >= recall_levels[None, :, None]
+    max_prc = np.where(reached, precisions[:, None, :], 0).max(axis=2)
+    return 1.0 / len(recall_levels)*max_prc.sum(axis=1)
+
+
+def get_bootstrap_image_statistics(ground_truth_boxes, predicted_boxes, iou_threshold):
+    """Collects per image statistics from the dicts used by mean_average_precision.
+
+    Args:
+        ground_truth_boxes: (dict) as in mean_average_precision
+        predicted_boxes: (dict) as in mean_average_precision
+        iou_threshold (float): minimum IoU for a match
+    Returns:
+        tuple: (true_pos, false_pos, num_gt) as returned by get_image_statistics
+    """
+    all_gt_boxes = []
+    all_prediction_boxes = []
+    confidence_scores = []
+
+    for image_id in ground_truth_boxes.keys():
+        all_gt_boxes.append(ground_truth_boxes[image_id])
+        all_prediction_boxes.append(predicted_boxes[image_id]["boxes"])
+        confidence_scores.append(predicted_boxes[image_id]["scores"])
+    return get_image_statistics(all_prediction_boxes, all_gt_boxes,
+                                confidence_scores, iou_threshold)
+
+
+def bootstrap_mean_average_precision(ground_truth_boxes, predicted_boxes,
+                                     num_samples=1000, confidence_level=0.95,
+                                     seed=None):
+    """ Calculates the mean average precision over the given dataset
+        with IoU threshold of 0.5, together with a bootstrap confidence
+        interval from resampling the images.
+
+    Args:
+        ground_truth_boxes: (dict) as in mean_average_precision
+        predicted_boxes: (dict) as in mean_average_precision
+        num_samples (int): number of bootstrap resamples
+        confidence_level (float): coverage of the confidence interval
+        seed (int): seed for the random number generator
+    Returns:
+        dict: {"mean_average_precision": float, "lower": float, "upper": float,
+               "samples": np.array of floats with shape [num_samples]}
+    """
+    iou_threshold = 0.5
+    true_pos, false_pos, num_gt = get_bootstrap_image_statistics(
+        ground_truth_boxes, predicted_boxes, iou_threshold)
+
+    weights = get_bootstrap_weights(len(num_gt), num_samples, seed)
+    # The first row is the full dataset, the rest are the resamples
+    weights = np.concatenate([np.ones((1, len(num_gt))), weights], axis=0)
+    mAPs = calculate_bootstrap_mean_average_precisions(
+        true_pos, false_pos, num_gt, weights)
+    mAP = mAPs[0]
+    samples = mAPs[1:]
+
+    alpha = 1 - confidence_level
+    lower, upper = np.percentile(samples, [100*alpha/2, 100*(1 - alpha/2)])
+    print("Mean average precision: {:.4f} ({:.0%} CI: {:.4f} - {:.4f})".format(
+        mAP, confidence_level, lower, upper))
+    return {"mean_average_precision": mAP, "lower": lower, "upper": upper,
+            "samples": samples}
+
+
+def compare_mean_average_precision(ground_truth_boxes, predicted_boxes_a,
+                                   predicted_boxes_b, num_samples=1000,
+                                   confidence_level=0.95, seed=None):
+    """ Paired bootstrap comparison of the mean average precision of two
+        sets of predictions on the same images, with IoU threshold of 0.5.
+        Both prediction sets are evaluated on the same resamples.
+
+    Args:
+        ground_truth_boxes: (dict) as in mean_average_precision
+        predicted_boxes_a: (dict) as predicted_boxes in mean_average_precision
+        predicted_boxes_b: (dict) as predicted_boxes in mean_average_precision
+        num_samples (int): number of bootstrap resamples
+        confidence_level (float): coverage of the confidence interval
+        seed (int): seed for the random number generator
+    Returns:
+        dict: {"mean_average_precision_a": float, "mean_average_precision_b": float,
+               "difference": float, "lower": float, "upper": float, "p_value": float,
+               "samples": np.array of floats with shape [num_samples]}
+            difference, lower, upper and samples are for mAP b - mAP a.
+            p_value is the two-sided bootstrap p-value for no difference.
+    """
+    iou_threshold = 0.5
+    stats_a = get_bootstrap_image_statistics(
+        ground_truth_boxes, predicted_boxes_a, iou_threshold)
+    stats_b = get_bootstrap_image_statistics(
+        ground_truth_boxes, predicted_boxes_b, iou_threshold)
+
+    num_images = len(stats_a[2])
+    weights = get_bootstrap_weights(num_images, num_samples, seed)
+    # The first row is the full dataset, the rest are the resamples
+    weights = np.concatenate([np.ones((1, num_images)), weights], axis=0)
+    map_a = calculate_bootstrap_mean_average_precisions(*stats_a, weights)
+    map_b = calculate_bootstrap_mean_average_precisions(*stats_b, weights)
+
+    difference = map_b[0] - map_a[0]
+    samples = map_b[1:] - map_a[1:]
+    alpha = 1 - confidence_level
+    lower, upper = np.percentile(samples, [100*alpha/2, 100*(1 - alpha/2)])
+    p_value = min(1.0, 2*min(np.mean(samples <= 0), np.mean(samples >= 0)))
+    print("Mean average precision difference: {:.4f} ({:.0%} CI: {:.4f} - {:.4f}, p = {:.4f})".format(
+        difference, confidence_level, lower, upper, p_value))
+    return {"mean_average_precision_a": map_a[0], "mean_average_precision_b": map_b[0],
+            "difference": difference, "lower": lower, "upper": upper,
+            "p_value": p_value, "samples": samples}
+
+
 if __name__ == "__main__":
     ground_truth_boxes = read_ground_truth_boxes()
     predicted_boxes = read_predicted_boxes()
     keys_gt = list(ground_truth_boxes.keys())
     keys_pred = list(predicted_boxes.keys())
     mean_average_precision(ground_truth_boxes, predicted_boxes)
+    bootstrap_mean_average_precision(ground_truth_boxes, predicted_boxes, seed=0)
     #iou_threshold = 0.001
     #match, gt = get_all_box_matches(predicted_boxes[keys_pred[0]]['boxes'], ground_truth_boxes[keys_gt[0]], iou_threshold)
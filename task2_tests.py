@@ -202,6 +202,67 @@ def test_mean_average_precision():
     assert round(res1, 5) == ans1, "Expected {}, got: {}".format(ans1, res1)
 
 
+def test_get_image_statistics():
+    print("="*80)
+    print("Running tests for get_image_statistics")
+    b1 = np.array([
+        [0, 0, 1, 1],
+        [0.5, 0.5, 1.5, 1.5],
+        [2, 2, 3, 3],
+        [5.5, 5.5, 8, 8]
+    ])
+    b2 = np.array([
+        [0, 0, 1, 1],
+        [0, 0, 1.5, 1.5],
+        [3, 3, 4, 4],
+        [5, 5, 8, 8]
+    ])
+    s = np.array([0.4, 0.7, 0.6, 0.9])
+    tp, fp, num_gt = get_image_statistics([b1, b2], [b2, b2], [s, s], 0.5)
+    assert tp.shape == (2, 500)
+    assert np.all(num_gt == [4, 4])
+
+    tp, fp, num_gt = tp.sum(axis=0), fp.sum(axis=0), num_gt.sum()
+    res1 = np.where(tp + fp == 0, 1, tp / np.maximum(tp + fp, 1))
+    res2 = tp / num_gt
+    ans1, ans2 = get_precision_recall_curve([b1, b2], [b2, b2], [s, s], 0.5)
+    assert np.allclose(res1, ans1), "Expected {}, got: {}".format(ans1, res1)
+    assert np.allclose(res2, ans2), "Expected {}, got: {}".format(ans2, res2)
+
+
+def test_bootstrap_mean_average_precisions():
+    print("="*80)
+    print("Running tests for calculate_bootstrap_mean_average_precisions")
+    weights = get_bootstrap_weights(5, 100, seed=0)
+    assert weights.shape == (100, 5)
+    assert np.all(weights.sum(axis=1) == 5)
+
+    b1 = np.array([
+        [0, 0, 1, 1],
+        [0.5, 0.5, 1.5, 1.5],
+        [2, 2, 3, 3],
+        [5.5, 5.5, 8, 8]
+    ])
+    b2 = np.array([
+        [0, 0, 1, 1],
+        [0, 0, 1.5, 1.5],
+        [3, 3, 4, 4],
+        [5, 5, 8, 8]
+    ])
+    s = np.array([0.4, 0.7, 0.6, 0.9])
+    stats = get_image_statistics([b1, b2], [b2, b2], [s, s], 0.5)
+    p, r = get_precision_recall_curve([b1, b2], [b2, b2], [s, s], 0.5)
+    ans1 = calculate_mean_average_precision(p, r)
+    # Resamples that draw both images once are the full dataset
+    res1 = calculate_bootstrap_mean_average_precisions(
+        *stats, np.array([[1, 1], [2, 2]]))
+    assert np.allclose(res1, ans1), "Expected {}, got: {}".format(ans1, res1)
+
+    # Image 1 on its own is predicted perfectly
+    res2 = calculate_bootstrap_mean_average_precisions(*stats, np.array([[0, 3]]))
+    assert np.allclose(res2, 1.0), "Expected {}, got: {}".format(1.0, res2)
+
+
 if __name__ == "__main__":
     test_iou()
     test_precision()
@@ -211,5 +272,7 @@ if __name__ == "__main__":
     test_calculate_precision_recall_all_images()
     test_get_precision_recall_curve()
     test_mean_average_precision()
+    test_get_image_statistics()
+    test_bootstrap_mean_average_precisions()
     print("="*80)
     print("All tests OK.")